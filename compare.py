@@ -1,13 +1,33 @@
 import os
-import filecmp
-from difflib import HtmlDiff, unified_diff
+import hashlib
+import mmap
+import stat
+import html
+import io
+import json
+from difflib import HtmlDiff, SequenceMatcher, unified_diff
 import git
 import shutil
 import datetime
 import logging
 import argparse
 import sys
-from report_template import generate_html_report
+import re
+import fnmatch
+from collections import defaultdict, deque, namedtuple
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from report_template import generate_html_report, only_in_label
+
+try:
+    from rapidfuzz.distance import Levenshtein as _rapidfuzz_levenshtein
+except ImportError:
+    _rapidfuzz_levenshtein = None
+
+try:
+    from cdifflib import CSequenceMatcher as _SequenceMatcher
+except ImportError:
+    _SequenceMatcher = SequenceMatcher
 
 # Set up global logging
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -33,136 +53,505 @@ def setup_logging(log_dir):
     logging.getLogger().addHandler(file_handler)
     return log_filename
 
+CLONE_OPTIONS = ['--filter=blob:none', '--no-tags']
+
 def clone_repo(repo_url, target_dir, depth=1):
     """Clone a repository from a given URL to a target directory."""
     if os.path.exists(target_dir):
         shutil.rmtree(target_dir)
     try:
+        # Blobless partial clone: only the blobs needed for the checkout are downloaded
         if depth is None:
-            git.Repo.clone_from(repo_url, target_dir)
-            logging.info(f"Cloned {repo_url} to {target_dir} (full clone)")
+            git.Repo.clone_from(repo_url, target_dir, multi_options=CLONE_OPTIONS)
+            logging.info("Cloned %s to %s (full clone)", repo_url, target_dir)
         else:
-            git.Repo.clone_from(repo_url, target_dir, depth=depth)
-            logging.info(f"Cloned {repo_url} to {target_dir} (depth: {depth})")
+            git.Repo.clone_from(repo_url, target_dir, multi_options=CLONE_OPTIONS, depth=depth, single_branch=True)
+            logging.info("Cloned %s to %s (depth: %s)", repo_url, target_dir, depth)
     except git.exc.GitCommandError as e:
-        logging.error(f"Failed to clone {repo_url}: {str(e)}")
+        logging.error("Failed to clone %s: %s", repo_url, e)
         raise
 
-def compare_dirs(dir1, dir2, deep_compare=False):
-    """Compare two directories and return differences."""
-    diff_files = []
-    same_files = []
-    only_in_dir1 = []
-    only_in_dir2 = []
-    
-    if deep_compare:
-        matching_files = find_matching_files(dir1, dir2)
-        
-        for file1_path, file2_path in matching_files:
-            if not filecmp.cmp(file1_path, file2_path, shallow=False):
-                diff_files.append((os.path.relpath(file1_path, dir1), os.path.relpath(file2_path, dir2)))
-        
-        # Deep scan (thorough comparison)
-        for root, _, files in os.walk(dir1):
-            if '.git' in root.split(os.path.sep):
-                continue
-            for file in files:
-                path1 = os.path.join(root, file)
-                path2 = os.path.join(dir2, os.path.relpath(path1, dir1))
-                if os.path.exists(path2):
-                    if not filecmp.cmp(path1, path2, shallow=False):
-                        diff_files.append((os.path.relpath(path1, dir1), os.path.relpath(path2, dir2)))
-                    else:
-                        same_files.append((os.path.relpath(path1, dir1), os.path.relpath(path2, dir2)))
-                else:
-                    only_in_dir1.append(os.path.relpath(path1, dir1))
-        
-        for root, _, files in os.walk(dir2):
-            if '.git' in root.split(os.path.sep):
-                continue
-            for file in files:
-                path2 = os.path.join(root, file)
-                path1 = os.path.join(dir1, os.path.relpath(path2, dir2))
-                if not os.path.exists(path1):
-                    only_in_dir2.append(os.path.relpath(path2, dir2))
-    else:
-        # Shallow scan (original behavior from compare_old.py)
-        for root, _, files in os.walk(dir1):
-            if '.git' in root.split(os.path.sep):
+def git_blob_ids(repo_path):
+    """Map the full path of every regular file committed at HEAD in repo_path to its git blob id."""
+    listing = git.Repo(repo_path).git.ls_tree('-r', '-z', '--full-tree', 'HEAD')
+    blob_ids = {}
+    for record in listing.split('\0'):
+        if not record:
+            continue
+        meta, rel_path = record.split('\t', 1)
+        mode, obj_type, oid = meta.split()
+        if obj_type == 'blob' and mode != '120000':
+            blob_ids[os.path.join(repo_path, rel_path.replace('/', os.sep))] = oid
+    return blob_ids
+
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+PREFETCH_BATCH = 64
+COMPARE_CHUNK_SIZE = 1 << 20
+MMAP_MIN_SIZE = 64 * 1024
+# Bump whenever the rendered diff markup changes, so stale cache entries are ignored
+DIFF_CACHE_VERSION = b'5'
+# The opcode backends align lines differently, so each one's tables are cached apart
+if _rapidfuzz_levenshtein is not None:
+    DIFF_BACKEND = 'rapidfuzz'
+elif _SequenceMatcher is not SequenceMatcher:
+    DIFF_BACKEND = 'cdifflib'
+else:
+    DIFF_BACKEND = 'difflib'
+BINARY_SNIFF_SIZE = 8192
+MAX_DIFF_SIZE = 512 * 1024
+PARALLEL_DIFF_MIN = 8
+DIFF_WORKERS = os.cpu_count() or 1
+# The report and the diff dump are written in many small pieces; a large buffer turns them into few write() calls
+OUTPUT_BUFFER_SIZE = 1 << 20
+_digest_cache = {}
+
+def _stat_key(st):
+    """Identify a file version by its stat signature (device, inode, mtime, size)."""
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+def file_digest(path, st=None):
+    """Return the content digest of a file, memoized by its stat signature."""
+    if st is None:
+        st = os.stat(path)
+    key = _stat_key(st)
+    digest = _digest_cache.get(key)
+    if digest is None:
+        hasher = hashlib.blake2b()
+        if st.st_size:
+            # Hash straight from the page cache instead of copying the file through read() buffers
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+        digest = _digest_cache[key] = hasher.digest()
+    return digest
+
+def _contents_equal(path1, path2, size):
+    """Compare two files of the given size byte for byte, stopping at the first differing chunk."""
+    if not size:
+        return True
+    if size < MMAP_MIN_SIZE:
+        # Setting up two mappings costs more than one read each for small files
+        with open(path1, 'rb') as f1, open(path2, 'rb') as f2:
+            return f1.read() == f2.read()
+    with open(path1, 'rb') as f1, open(path2, 'rb') as f2, \
+         mmap.mmap(f1.fileno(), 0, access=mmap.ACCESS_READ) as mm1, \
+         mmap.mmap(f2.fileno(), 0, access=mmap.ACCESS_READ) as mm2:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm1.madvise(mmap.MADV_SEQUENTIAL)
+            mm2.madvise(mmap.MADV_SEQUENTIAL)
+        for offset in range(0, size, COMPARE_CHUNK_SIZE):
+            end = offset + COMPARE_CHUNK_SIZE
+            if mm1[offset:end] != mm2[offset:end]:
+                return False
+    return True
+
+def files_equal(path1, path2, st1=None, st2=None):
+    """Check whether two files have the same content (size first, then bytes)."""
+    if st1 is None:
+        st1 = os.stat(path1)
+    if st2 is None:
+        st2 = os.stat(path2)
+    # A broken symlink was indexed by its lstat result; it has no contents to open, only a target
+    if stat.S_ISLNK(st1.st_mode) or stat.S_ISLNK(st2.st_mode):
+        return stat.S_ISLNK(st1.st_mode) and stat.S_ISLNK(st2.st_mode) and os.readlink(path1) == os.readlink(path2)
+    if st1.st_size != st2.st_size:
+        return False
+    return _contents_equal(path1, path2, st1.st_size)
+
+# Which files a scan visits: directory names to prune, an optional extension allowlist
+# and an optional compiled regex of relpath glob patterns to exclude
+ScanFilter = namedtuple('ScanFilter', ['skip_dirs', 'include_ext', 'exclude_re'])
+DEFAULT_SCAN_FILTER = ScanFilter(frozenset({'.git'}), None, None)
+
+def make_scan_filter(include_ext=None, exclude_dirs=(), exclude_patterns=()):
+    """Build a ScanFilter, compiling the exclude glob patterns into a single regex once."""
+    exclude_re = None
+    if exclude_patterns:
+        exclude_re = re.compile('|'.join(fnmatch.translate(pattern) for pattern in exclude_patterns))
+    return ScanFilter(
+        DEFAULT_SCAN_FILTER.skip_dirs | frozenset(exclude_dirs),
+        frozenset(include_ext) if include_ext else None,
+        exclude_re,
+    )
+
+def _included(scan_filter, name, rel_path):
+    """Check a file against the extension allowlist and exclude patterns of a ScanFilter."""
+    if scan_filter.include_ext is not None and os.path.splitext(name)[1] not in scan_filter.include_ext:
+        return False
+    return scan_filter.exclude_re is None or not scan_filter.exclude_re.match(rel_path)
+
+# A scanned file: its full path and its stat result
+FileEntry = namedtuple('FileEntry', ['path', 'st'])
+
+def _stat_at(name, dir_fd):
+    """Stat a file relative to an open directory fd, falling back to lstat for broken symlinks."""
+    try:
+        return os.stat(name, dir_fd=dir_fd)
+    except FileNotFoundError:
+        return os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+
+def _entry_stat(entry):
+    """Return a DirEntry's cached stat, falling back to lstat for broken symlinks."""
+    try:
+        return entry.stat()
+    except FileNotFoundError:
+        return entry.stat(follow_symlinks=False)
+
+def _scan(root, scan_filter=DEFAULT_SCAN_FILTER):
+    """Yield (relpath, FileEntry) for every file under root that passes scan_filter."""
+    skip_dirs = scan_filter.skip_dirs
+    # Only pay for the per-file filter call when a filter is actually configured
+    filtered = scan_filter.include_ext is not None or scan_filter.exclude_re is not None
+    if hasattr(os, 'fwalk'):
+        join, stat_at, sep = os.path.join, _stat_at, os.sep
+        # fwalk does not follow a symlinked root, so walk its target but keep reporting paths under root
+        real_root = os.path.realpath(root)
+        root_prefix_len = len(os.path.join(real_root, ''))
+        for dir_path, dirs, files, dir_fd in os.fwalk(real_root):
+            dirs[:] = [d for d in dirs if d not in skip_dirs]
+            rel_prefix = dir_path[root_prefix_len:] + sep if len(dir_path) > root_prefix_len else ''
+            for name in files:
+                rel_path = rel_prefix + name
+                if not filtered or _included(scan_filter, name, rel_path):
+                    yield rel_path, FileEntry(join(root, rel_path), stat_at(name, dir_fd))
+        return
+    stack = [(root, '')]
+    while stack:
+        dir_path, rel_prefix = stack.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                # follow_symlinks=False answers from d_type alone, without stat-ing symlink targets
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip_dirs:
+                        stack.append((entry.path, rel_prefix + entry.name + os.sep))
+                elif not entry.is_symlink() or not entry.is_dir():
+                    rel_path = rel_prefix + entry.name
+                    if not filtered or _included(scan_filter, entry.name, rel_path):
+                        yield rel_path, FileEntry(entry.path, _entry_stat(entry))
+
+def _prefetch(pairs):
+    """Ask the kernel to start reading the first chunk of pairs with known (equal) sizes before they are compared."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for pair in pairs:
+        if len(pair) < 4:
+            continue
+        for path in pair[:2]:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
                 continue
-            for file in files:
-                path1 = os.path.join(root, file)
-                path2 = os.path.join(dir2, os.path.relpath(path1, dir1))
-                if os.path.exists(path2):
-                    if not filecmp.cmp(path1, path2, shallow=False):
-                        diff_files.append((os.path.relpath(path1, dir1), os.path.relpath(path2, dir2)))
-                    else:
-                        same_files.append((os.path.relpath(path1, dir1), os.path.relpath(path2, dir2)))
-                else:
-                    only_in_dir1.append(os.path.relpath(path1, dir1))
-        
-        for root, _, files in os.walk(dir2):
-            if '.git' in root.split(os.path.sep):
+            try:
+                # Only the first chunk: the compare stops at the first differing chunk, so more may never be read
+                os.posix_fadvise(fd, 0, COMPARE_CHUNK_SIZE, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+
+def compare_pairs(pairs, max_workers=MAX_WORKERS, blob_ids=None):
+    """Compare (path1, path2[, stat1, stat2]) pairs concurrently and return one equality flag per pair."""
+    results = [False] * len(pairs)
+    pending = []
+    for i, pair in enumerate(pairs):
+        if blob_ids:
+            oid1, oid2 = blob_ids.get(pair[0]), blob_ids.get(pair[1])
+            # Ids from repositories with different hash algorithms are not comparable
+            if oid1 is not None and oid2 is not None and len(oid1) == len(oid2):
+                results[i] = oid1 == oid2
                 continue
-            for file in files:
-                path2 = os.path.join(root, file)
-                path1 = os.path.join(dir1, os.path.relpath(path2, dir2))
-                if not os.path.exists(path1):
-                    only_in_dir2.append(os.path.relpath(path2, dir2))
+        # Pairs whose sizes already differ are settled here, without a round trip through the pool
+        if len(pair) < 4 or pair[2].st_size == pair[3].st_size:
+            pending.append(i)
+    if not pending:
+        return results
+    # Largest files first, so one big file does not start last and hold up the whole pool
+    pending.sort(key=lambda i: pairs[i][2].st_size if len(pairs[i]) == 4 else 0, reverse=True)
+    batches = [pending[i:i + PREFETCH_BATCH] for i in range(0, len(pending), PREFETCH_BATCH)]
+
+    def compare(i):
+        return files_equal(*pairs[i])
+
+    _prefetch(pairs[i] for i in batches[0])
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(compare, i): i for i in batches[0]}
+        for n in range(len(batches)):
+            # Queue the next batch before collecting this one, so workers never wait on the slowest file
+            next_futures = {}
+            if n + 1 < len(batches):
+                _prefetch(pairs[i] for i in batches[n + 1])
+                next_futures = {executor.submit(compare, i): i for i in batches[n + 1]}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+            futures = next_futures
+    return results
+
+def _index(root, scan_filter=DEFAULT_SCAN_FILTER):
+    """Map each file's path relative to root to its FileEntry."""
+    return dict(_scan(root, scan_filter))
+
+def _collapse_missing_dirs(only_files, other_files):
+    """Replace the files under each directory missing from other_files with one 'dir/' entry."""
+    other_dirs = set()
+    for rel_path in other_files:
+        directory = os.path.dirname(rel_path)
+        while directory and directory not in other_dirs:
+            other_dirs.add(directory)
+            directory = os.path.dirname(directory)
+    collapsed = []
+    sep = os.sep
+    for rel_path in only_files:
+        parts = rel_path.split(sep)
+        entry = rel_path
+        for depth in range(1, len(parts)):
+            directory = sep.join(parts[:depth])
+            if directory not in other_dirs:
+                entry = directory + sep
+                break
+        if not collapsed or collapsed[-1] != entry:
+            collapsed.append(entry)
+    return collapsed
+
+def compare_dirs(dir1, dir2, deep_compare=False, scan_filter=DEFAULT_SCAN_FILTER,
+                 max_workers=MAX_WORKERS, blob_ids=None, deep_listing=False):
+    """Compare two directories and return differences."""
+    # Walk each tree exactly once; membership is then plain set algebra on the relpaths
+    files1, files2 = _index(dir1, scan_filter), _index(dir2, scan_filter)
+    only_in_dir1 = sorted(files1.keys() - files2.keys())
+    only_in_dir2 = sorted(files2.keys() - files1.keys())
+    if not deep_listing:
+        only_in_dir1 = _collapse_missing_dirs(only_in_dir1, files2)
+        only_in_dir2 = _collapse_missing_dirs(only_in_dir2, files1)
+    
+    # Deep scan additionally pairs up files with the same name in different directories
+    # (one walk per tree, then a basename lookup table instead of re-walking dir2 per file)
+    rel_pairs = _name_matches(files1, files2) if deep_compare else []
+    name_matches = len(rel_pairs)
+    rel_pairs.extend((rel_path, rel_path) for rel_path in sorted(files1.keys() & files2.keys()))
+    
+    # One comparison pass for both kinds of pair
+    results = compare_pairs(_entry_pairs(files1, files2, rel_pairs), max_workers, blob_ids)
+    diff_files = [rel_pair for rel_pair, equal in zip(rel_pairs, results) if not equal]
+    same_files = [rel_pair for rel_pair, equal in zip(rel_pairs[name_matches:], results[name_matches:]) if equal]
 
     return diff_files, same_files, only_in_dir1, only_in_dir2
 
-def find_matching_files(dir1, dir2):
-    """Find files with the same name across different directory structures."""
-    # NOTE: This is a simple heuristic to find files with the same name across different directory structures.
-    # NOTE: A smarter approach would be to use a more advanced algorithm to find files with the "similar" content.
-    matching_files = []
-    for root1, _, files1 in os.walk(dir1):
-        if '.git' in root1.split(os.path.sep):
-            continue
-        for file1 in files1:
-            file1_path = os.path.join(root1, file1)
-            for root2, _, files2 in os.walk(dir2):
-                if '.git' in root2.split(os.path.sep):
-                    continue
-                if file1 in files2:
-                    file2_path = os.path.join(root2, file1)
-                    matching_files.append((file1_path, file2_path))
-    return matching_files
-
-def side_by_side_diff(file1, file2, file1_name, file2_name):
-    """Generate a side-by-side diff of two files."""
+def _entry_pairs(files1, files2, rel_pairs):
+    """Turn (relpath1, relpath2) pairs into the (path1, path2, stat1, stat2) tuples compare_pairs takes."""
+    return [
+        (entry1.path, entry2.path, entry1.st, entry2.st)
+        for entry1, entry2 in ((files1[rel_path1], files2[rel_path2]) for rel_path1, rel_path2 in rel_pairs)
+    ]
+
+def _name_matches(files1, files2):
+    """Pair each relpath in files1 with every same-named file at a different path in files2."""
+    basename, by_name = os.path.basename, defaultdict(list)
+    for rel_path2 in files2:
+        by_name[basename(rel_path2)].append(rel_path2)
+    get = by_name.get
+    return [
+        (rel_path1, rel_path2)
+        for rel_path1 in sorted(files1)
+        for rel_path2 in get(basename(rel_path1), ())
+        if rel_path2 != rel_path1
+    ]
+
+def diff_opcodes(lines1, lines2):
+    """Return difflib-style opcodes for two lists of lines (rapidfuzz, then cdifflib, then difflib)."""
+    if _rapidfuzz_levenshtein is not None:
+        return [tuple(opcode) for opcode in _rapidfuzz_levenshtein.opcodes(lines1, lines2)]
+    return _SequenceMatcher(None, lines1, lines2).get_opcodes()
+
+def _diff_cell(line, css_class):
+    """Render the line-number and text cells for one side of a diff row."""
+    if line is None:
+        return '<td class="diff_header"></td><td class="diff_text"></td>'
+    number, text = line
+    text = html.escape(text.rstrip('\r\n'))
+    if css_class:
+        text = f'<span class="{css_class}">{text}</span>'
+    return f'<td class="diff_header">{number}</td><td class="diff_text">{text}</td>'
+
+def render_side_by_side(lines1, lines2, file1_name, file2_name, context=True, numlines=3):
+    """Render two lists of lines as a side-by-side HTML diff table."""
+    rows = []
+    opcodes = diff_opcodes(lines1, lines2)
+    last = len(opcodes) - 1
+    for index, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+        if tag == 'equal':
+            lead = 0 if index == 0 else numlines
+            trail = 0 if index == last else numlines
+            if context and i2 - i1 > lead + trail:
+                spans = [(i1, i1 + lead, j1), (i2 - trail, i2, j2 - trail)]
+            else:
+                spans = [(i1, i2, j1)]
+            for n, (start, stop, offset) in enumerate(spans):
+                if n:
+                    rows.append('<tr><td class="diff_next" colspan="4">...</td></tr>')
+                for k in range(stop - start):
+                    rows.append('<tr>' + _diff_cell((start + k + 1, lines1[start + k]), None)
+                                + _diff_cell((offset + k + 1, lines2[offset + k]), None) + '</tr>')
+        else:
+            class1, class2 = {'replace': ('diff_chg', 'diff_chg'),
+                              'delete': ('diff_sub', None),
+                              'insert': (None, 'diff_add')}[tag]
+            for k in range(max(i2 - i1, j2 - j1)):
+                left = (i1 + k + 1, lines1[i1 + k]) if i1 + k < i2 else None
+                right = (j1 + k + 1, lines2[j1 + k]) if j1 + k < j2 else None
+                rows.append('<tr>' + _diff_cell(left, class1) + _diff_cell(right, class2) + '</tr>')
+    if not any(tag != 'equal' for tag, *_ in opcodes):
+        rows = ['<tr><td class="diff_next" colspan="4">No Differences Found</td></tr>']
+    header = (f'<thead><tr><th class="diff_header" colspan="2">{html.escape(file1_name)}</th>'
+              f'<th class="diff_header" colspan="2">{html.escape(file2_name)}</th></tr></thead>')
+    return '<table class="diff">' + header + '<tbody>' + '\n'.join(rows) + '</tbody></table>'
+
+def is_binary_file(path):
+    """Guess whether a file is binary by looking for a NUL byte in its first BINARY_SNIFF_SIZE bytes."""
+    with open(path, 'rb') as f:
+        return b'\0' in f.read(BINARY_SNIFF_SIZE)
+
+def read_lines(path):
+    """Read a UTF-8 text file into a list of lines, replacing any undecodable bytes."""
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return []
+        # Decode directly from the mapping: one str allocation, no intermediate bytes copy
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, 'utf-8', 'replace')
+    # Split like a text-mode readlines(): on newlines only, with \r and \r\n translated to \n
+    return io.StringIO(text, newline=None).readlines()
+
+def side_by_side_diff(lines1, lines2, file1_name, file2_name):
+    """Generate a side-by-side diff of two files' lines."""
+    diff_table = render_side_by_side(
+        lines1, lines2, file1_name, file2_name, context=True, numlines=3
+    )
+    
+    # Generate unified diff for logging, only when someone will actually see it
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        unified = '\n'.join(unified_diff(lines1, lines2, file1_name, file2_name))
+        logging.debug("Diff between %s and %s:\n%s\n", file1_name, file2_name, unified)
+    
+    return diff_table
+
+def legacy_side_by_side_diff(lines1, lines2, file1_name, file2_name):
+    """Generate a side-by-side diff with difflib.HtmlDiff, as reports did before the opcode renderer."""
+    return HtmlDiff().make_table(lines1, lines2, file1_name, file2_name, context=True, numlines=3)
+
+def client_diff_placeholder(lines1, lines2, file1_name, file2_name):
+    """Embed both files as JSON so the report diffs them in the browser once they are shown."""
+    payload = json.dumps({'name1': file1_name, 'name2': file2_name, 'a': ''.join(lines1), 'b': ''.join(lines2)})
+    # Keep the payload from closing its <script> element early
+    payload = payload.replace('<', '\\u003c').replace('>', '\\u003e').replace('&', '\\u0026')
+    return f'<div class="client-diff"><script type="application/json">{payload}</script></div>'
+
+def _content_id(path, blob_id=None):
+    """Identify a file's content by its git blob id when known (no read needed), else by its digest."""
+    if blob_id is not None:
+        return b'git:' + blob_id.encode('ascii')
+    return b'file:' + file_digest(path)
+
+def diff_cache_key(path1, path2, file1_name, file2_name, blob_id1=None, blob_id2=None):
+    """Build the on-disk diff cache key from the diff backend and both files' content ids and display names."""
+    hasher = hashlib.blake2b(DIFF_CACHE_VERSION, digest_size=20)
+    hasher.update(DIFF_BACKEND.encode('ascii'))
+    hasher.update(b'\0')
+    hasher.update(_content_id(path1, blob_id1))
+    hasher.update(b'\0')
+    hasher.update(_content_id(path2, blob_id2))
+    hasher.update(f"\0{file1_name}\0{file2_name}".encode('utf-8'))
+    return hasher.hexdigest()
+
+def cached_render(render, cache_key, lines1, lines2, file1_name, file2_name, cache_dir):
+    """Return the rendered diff for a pair from cache_dir, rendering and storing it on a miss."""
+    cache_path = os.path.join(cache_dir, cache_key + '.html')
     try:
-        with open(file1, 'r', encoding='utf-8') as f1, open(file2, 'r', encoding='utf-8') as f2:
-            lines1 = f1.readlines()
-            lines2 = f2.readlines()
-            
-            differ = HtmlDiff()
-            diff_table = differ.make_table(
-                lines1, lines2, file1_name, file2_name, context=True, numlines=3
-            )
-            
-            # Generate unified diff for logging
-            unified = '\n'.join(unified_diff(lines1, lines2, file1_name, file2_name))
-            logging.debug(f"Diff between {file1_name} and {file2_name}:\n{unified}\n")
-            
-            return diff_table
-    except UnicodeDecodeError:
-        error_message = f"Unable to compare {file1} and {file2} due to encoding issues."
-        logging.debug(error_message)
-        return f"<p>{error_message}</p>"
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    diff_html = render(lines1, lines2, file1_name, file2_name)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(diff_html)
+    os.replace(tmp_path, cache_path)
+    return diff_html
+
+def diff_pair(job):
+    """Read one differing pair and return (log_parts, diff_html); runs in a worker process."""
+    file1, file2, path1, path2, file1_name, file2_name, render, cache_dir, max_diff_size, blob_id1, blob_id2 = job
+    if not (os.path.exists(path1) and os.path.exists(path2)):
+        return (f"Files {file1} and {file2} differ; broken symlink.\n\n",), f"<p>Broken symlink differs: {html.escape(file1_name)}</p>"
+    size = max(os.path.getsize(path1), os.path.getsize(path2))
+    if max_diff_size and size > max_diff_size:
+        return ((f"Files {file1} and {file2} differ; diff skipped ({size} bytes).\n\n",),
+                f"<p>File too large ({size} bytes); diff skipped: {html.escape(file1_name)}</p>")
+    if is_binary_file(path1) or is_binary_file(path2):
+        return (f"Binary files {file1} and {file2} differ.\n\n",), f"<p>Binary file differs: {html.escape(file1_name)}</p>"
+    lines1 = read_lines(path1)
+    lines2 = read_lines(path2)
+    # Kept in pieces so the diff text is not copied again just to add the header
+    log_parts = (f"Diff between {file1} and {file2}:\n",
+                ''.join(unified_diff(lines1, lines2, fromfile=file1_name, tofile=file2_name)), "\n\n")
+    if cache_dir is None:
+        return log_parts, render(lines1, lines2, file1_name, file2_name)
+    cache_key = diff_cache_key(path1, path2, file1_name, file2_name, blob_id1, blob_id2)
+    return log_parts, cached_render(render, cache_key, lines1, lines2, file1_name, file2_name, cache_dir)
+
+def _map_ahead(executor, fn, items, window):
+    """Like executor.map, but with at most window calls submitted ahead of the result being yielded."""
+    items = iter(items)
+    futures = deque(executor.submit(fn, item) for item in islice(items, window))
+    while futures:
+        result = futures.popleft().result()
+        for item in islice(items, 1):
+            futures.append(executor.submit(fn, item))
+        yield result
+
+def iter_file_diffs(diff_files, repo1_path, repo2_path, repo1_name, repo2_name, log_file, client_diff=False,
+                    cache_dir=None, max_diff_size=MAX_DIFF_SIZE, blob_ids=None, legacy=False):
+    """Read each differing pair once, dump its unified diff to log_file and yield its HTML diff."""
+    if client_diff:
+        render = client_diff_placeholder
+    elif legacy:
+        render = legacy_side_by_side_diff
+    else:
+        render = side_by_side_diff
+    # Only the default tables are cached; the cache key does not tell renderers apart
+    if cache_dir is not None and render is side_by_side_diff:
+        os.makedirs(cache_dir, exist_ok=True)
+    else:
+        cache_dir = None
+    blob_ids = blob_ids or {}
+    jobs = []
+    for file1, file2 in diff_files:
+        path1, path2 = os.path.join(repo1_path, file1), os.path.join(repo2_path, file2)
+        jobs.append((file1, file2, path1, path2, f"{repo1_name}/{file1}", f"{repo2_name}/{file2}", render,
+                     cache_dir, max_diff_size, blob_ids.get(path1), blob_ids.get(path2)))
+    # A pool only pays for its start-up cost once there are a few files to spread out. HtmlDiff numbers
+    # its anchor ids with a per-process counter, so legacy tables are rendered in this process to keep them unique
+    parallel = len(jobs) >= PARALLEL_DIFF_MIN and render is not legacy_side_by_side_diff
+    executor = ProcessPoolExecutor(max_workers=DIFF_WORKERS) if parallel else None
+    # Finished diffs wait in the parent until the writer reaches them, so only run a little ahead of it
+    results = _map_ahead(executor, diff_pair, jobs, 2 * DIFF_WORKERS) if executor else map(diff_pair, jobs)
+    try:
+        for (file1, file2), (log_parts, diff_html) in zip(diff_files, results):
+            log_file.writelines(log_parts)
+            yield file1, file2, diff_html
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
 
 def get_full_repo_name(repo_url):
     """Extract the full repository name (owner/repo) from the URL."""
     parts = repo_url.rstrip('/').split('/')
     return f"{parts[-2]}_{parts[-1]}"
 
-def main(repo1_url, repo2_url, deep_compare=False, depth=1):
+def main(repo1_url, repo2_url, deep_compare=False, depth=1, scan_filter=DEFAULT_SCAN_FILTER,
+         client_diff=False, max_workers=MAX_WORKERS, max_diff_size=MAX_DIFF_SIZE, legacy=False, deep_listing=False):
     start_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    logging.info(f"Script started at {start_time}")
-    logging.info(f"Comparing repositories: {repo1_url} and {repo2_url}")
-    logging.info(f"Deep compare: {deep_compare}")
-    logging.info(f"Clone depth: {depth if depth is not None else 'Full'}")
+    logging.info("Script started at %s", start_time)
+    logging.info("Comparing repositories: %s and %s", repo1_url, repo2_url)
+    logging.info("Deep compare: %s", deep_compare)
+    logging.info("Max concurrency: %s", max_workers)
+    logging.info("Clone depth: %s", depth if depth is not None else 'Full')
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
     data_dir = os.path.join(script_dir, 'data')
@@ -178,54 +567,63 @@ def main(repo1_url, repo2_url, deep_compare=False, depth=1):
     repo1_path = os.path.join(data_dir, repo1_full_name)
     repo2_path = os.path.join(data_dir, repo2_full_name)
 
-    clone_repo(repo1_url, repo1_path, depth)
-    clone_repo(repo2_url, repo2_path, depth)
+    # Both clones are network-bound, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        clones = [executor.submit(clone_repo, repo1_url, repo1_path, depth)]
+        if repo2_path != repo1_path:
+            clones.append(executor.submit(clone_repo, repo2_url, repo2_path, depth))
+        for clone in clones:
+            clone.result()
 
-    diff_files, same_files, only_in_repo1, only_in_repo2 = compare_dirs(repo1_path, repo2_path, deep_compare)
+    # Git already hashed every committed file, so unchanged files need not be read at all
+    try:
+        blob_ids = git_blob_ids(repo1_path)
+        blob_ids.update(git_blob_ids(repo2_path))
+    except (git.exc.GitCommandError, git.exc.InvalidGitRepositoryError) as e:
+        logging.warning("Could not list git blob ids, comparing file contents instead: %s", e)
+        blob_ids = None
+
+    diff_files, same_files, only_in_repo1, only_in_repo2 = compare_dirs(
+        repo1_path, repo2_path, deep_compare, scan_filter=scan_filter, max_workers=max_workers, blob_ids=blob_ids,
+        deep_listing=deep_listing
+    )
     
-    logging.info(f"Number of files only in {repo1_full_name}: {len(only_in_repo1)}")
-    logging.info(f"Number of files only in {repo2_full_name}: {len(only_in_repo2)}")
-    logging.info(f"Number of different files: {len(diff_files)}")
-    logging.info(f"Number of files with same content: {len(same_files)}")
+    # Without deep_listing, a directory missing on the other side is one entry, however many files it holds
+    logging.info("Number of %s only in %s: %s", only_in_label(only_in_repo1), repo1_full_name, len(only_in_repo1))
+    logging.info("Number of %s only in %s: %s", only_in_label(only_in_repo2), repo2_full_name, len(only_in_repo2))
+    logging.info("Number of different files: %s", len(diff_files))
+    logging.info("Number of files with same content: %s", len(same_files))
     
-    # Write the full diff dump to the repo_comparison log file
-    with open(log_filename, 'a', encoding='utf-8') as log_file:
+    # The full diff dump goes to the repo_comparison log file while the report is
+    # rendered, so each differing file is read only once for both outputs
+    report_filename = os.path.join(comparison_dir, "comparison_report.html")
+    # The logging handler does not write to the log while the dump is open, so buffering cannot reorder it
+    with open(log_filename, 'a', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as log_file, \
+         open(report_filename, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as report_file:
         log_file.write("\n\n" + "=" * 50 + "\n")
         log_file.write("FULL DIFF DUMP:\n\n")
-        for file1, file2 in diff_files:
-            try:
-                with open(os.path.join(repo1_path, file1), 'r', encoding='utf-8') as f1, \
-                     open(os.path.join(repo2_path, file2), 'r', encoding='utf-8') as f2:
-                    lines1 = f1.readlines()
-                    lines2 = f2.readlines()
-                    diff = ''.join(unified_diff(lines1, lines2, 
-                                                fromfile=f"{repo1_full_name}/{file1}", 
-                                                tofile=f"{repo2_full_name}/{file2}"))
-                    log_file.write(f"Diff between {file1} and {file2}:\n{diff}\n\n")
-            except UnicodeDecodeError:
-                log_file.write(f"Unable to compare {file1} and {file2} due to encoding issues.\n\n")
-    
-    html_report = generate_html_report(
-        repo1_full_name, 
-        repo2_full_name, 
-        diff_files, 
-        same_files, 
-        only_in_repo1, 
-        only_in_repo2, 
-        repo1_path, 
-        repo2_path,
-        side_by_side_diff
-    )
-    
-    report_filename = os.path.join(comparison_dir, "comparison_report.html")
-    with open(report_filename, 'w', encoding='utf-8') as report_file:
-        report_file.write(html_report)
+        file_diffs = iter_file_diffs(
+            diff_files, repo1_path, repo2_path, repo1_full_name, repo2_full_name, log_file, client_diff,
+            cache_dir=os.path.join(data_dir, '.diff_cache'), max_diff_size=max_diff_size, blob_ids=blob_ids,
+            legacy=legacy
+        )
+        generate_html_report(
+            repo1_full_name, 
+            repo2_full_name, 
+            diff_files, 
+            same_files, 
+            only_in_repo1, 
+            only_in_repo2, 
+            file_diffs,
+            report_file,
+            client_diff
+        )
     
-    logging.info(f"Comparison complete. Results saved to {log_filename}")
-    logging.info(f"HTML report saved to {report_filename}")
+    logging.info("Comparison complete. Results saved to %s", log_filename)
+    logging.info("HTML report saved to %s", report_filename)
     
     end_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    logging.info(f"Script ended at {end_time}")
+    logging.info("Script ended at %s", end_time)
     logging.info("=" * 50)  # Add a separator between runs
 
 if __name__ == "__main__":
@@ -233,6 +631,14 @@ if __name__ == "__main__":
     parser.add_argument("--repo1", help="URL of the first repository")
     parser.add_argument("--repo2", help="URL of the second repository")
     parser.add_argument("--deep", action="store_true", help="Perform deep comparison")
+    parser.add_argument("--deep-listing", action="store_true", help="List every file of a directory that exists in one repository only, instead of the directory")
+    parser.add_argument("--include-ext", help="Comma-separated extensions to compare, e.g. .sol,.py (default: all files)")
+    parser.add_argument("--exclude-dir", action="append", default=[], help="Directory name to skip entirely (repeatable)")
+    parser.add_argument("--exclude", action="append", default=[], help="Glob pattern of relative paths to skip, e.g. '*.lock' (repeatable)")
+    parser.add_argument("--client-diff", action="store_true", help="Embed file contents and render diffs in the browser on demand (loads jsdiff from a CDN)")
+    parser.add_argument("--legacy", action="store_true", help="Render diff tables with difflib.HtmlDiff, as older reports did (slower)")
+    parser.add_argument("--max-concurrency", type=int, default=MAX_WORKERS, help=f"Number of files compared concurrently (default: {MAX_WORKERS})")
+    parser.add_argument("--max-diff-size", type=int, default=MAX_DIFF_SIZE, help=f"Skip the line diff of files larger than this many bytes (default: {MAX_DIFF_SIZE}, 0 for no limit)")
     parser.add_argument("--depth", type=int, default=1, help="Depth of git clone (default: 1, use None for full clone)")
     args = parser.parse_args()
 
@@ -244,4 +650,8 @@ if __name__ == "__main__":
         repo2_url = input("Enter the URL of the second repository: ")
 
     depth = args.depth if args.depth > 0 else None
-    main(repo1_url, repo2_url, args.deep, depth)
\ No newline at end of file
+    include_ext = [ext.strip() for ext in args.include_ext.split(',') if ext.strip()] if args.include_ext else None
+    scan_filter = make_scan_filter(include_ext, args.exclude_dir, args.exclude)
+    max_workers = max(1, args.max_concurrency)
+    main(repo1_url, repo2_url, args.deep, depth, scan_filter, args.client_diff, max_workers,
+         max(0, args.max_diff_size), args.legacy, args.deep_listing)
\ No newline at end of file
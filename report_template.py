@@ -1,331 +1,392 @@
-from jinja2 import Template
+import html
+import itertools
 import os
 
-def get_file_extensions(files):
-    """Get unique file extensions from the list of files."""
-    return sorted(set(os.path.splitext(file[0])[1] for file in files if os.path.splitext(file[0])[1]))
-
-def get_directories(files):
-    """Get unique directories from the list of files."""
-    return sorted(set(os.path.dirname(file[0]) for file in files if os.path.dirname(file[0])))
-
-def generate_html_report(repo1_name, repo2_name, diff_files, same_files, only_in_repo1, only_in_repo2, repo1_path, repo2_path, side_by_side_diff):
-    """Generate a single HTML report containing all diffs, similarities, and file lists."""
-    extensions = get_file_extensions(diff_files + same_files)
-    directories = get_directories(diff_files + same_files)
-    
-    html_template = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Repository Comparison: {{ repo1_name }} vs {{ repo2_name }}</title>
-        <style>
-            body { font-family: Arial, sans-serif; line-height: 1.6; padding: 20px; }
-            h1, h2 { color: #333; }
-            .file-list { margin-bottom: 20px; }
-            .file-list ul { list-style-type: none; padding-left: 20px; }
-            .diff-section { margin-bottom: 40px; }
-            .diff-file { margin-bottom: 20px; border: 1px solid #ddd; padding: 10px; }
-            .diff-file h3 { margin-top: 0; }
-            table.diff { font-family: monospace; border-collapse: collapse; width: 100%; }
-            .diff_header { background-color: #e0e0e0; }
-            td.diff_header { text-align: right; }
-            .diff_next { background-color: #c0c0c0; }
-            .diff_add { background-color: #aaffaa; }
-            .diff_chg { background-color: #ffff77; }
-            .diff_sub { background-color: #ffaaaa; }
-            #jump-table { margin-bottom: 20px; }
-            #jump-table table { border-collapse: collapse; width: 100%; }
-            #jump-table th, #jump-table td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-            #jump-table th { background-color: #f2f2f2; }
-            #filter-section { margin-bottom: 20px; }
-            .hidden { display: none; }
-            .filter-options { margin-top: 10px; }
-            .filter-options span { margin-right: 10px; cursor: pointer; }
-            .filter-options span:hover { text-decoration: underline; }
-            .same-files { margin-bottom: 20px; }
-            .same-files table { border-collapse: collapse; width: 100%; }
-            .same-files th, .same-files td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-            .same-files th { background-color: #f2f2f2; }
-            #search-bar { margin-bottom: 20px; }
-            #search-input { width: 300px; padding: 5px; }
-            .section-header { cursor: pointer; background-color: #f0f0f0; padding: 10px; border: 1px solid #ddd; border-radius: 5px; margin-bottom: 10px; }
-            .section-header:hover { background-color: #e0e0e0; }
-            .section-content { display: none; }
-        </style>
-    </head>
-    <body>
-        <h1>Repository Comparison: {{ repo1_name }} vs {{ repo2_name }}</h1>
-        
-        <div id="filter-section">
-            <label for="file-filter">Filter files: </label>
-            <input type="text" id="file-filter" placeholder="e.g., .sol, contracts/">
-            <button onclick="filterFiles()">Filter</button>
-            <button onclick="resetFilter()">Reset</button>
-            <div class="filter-options">
-                <strong>Extensions:</strong>
-                {% for ext in extensions %}
-                <span onclick="setFilter('{{ ext }}')">{{ ext }}</span>
-                {% endfor %}
-            </div>
-            <div class="filter-options">
-                <strong>Directories:</strong>
-                {% for dir in directories %}
-                <span onclick="setFilter('{{ dir }}/')">{{ dir }}/</span>
-                {% endfor %}
-            </div>
-        </div>
-        
-        <div id="search-bar">
-            <label for="search-input">Search files: </label>
-            <input type="text" id="search-input" placeholder="e.g., Contract.sol, contracts/">
-            <button onclick="searchFiles()">Search</button>
-            <button onclick="resetSearch()">Reset</button>
-        </div>
-
-        <div id="jump-table" class="section">
-            <h2 class="section-header" onclick="toggleSection('jump-table-content')">Jump to File Differences: ({{ diff_files|length }})</h2>
-            <div id="jump-table-content" class="section-content">
-                <table>
-                    <tr>
-                        <th>File in {{ repo1_name }}</th>
-                        <th>File in {{ repo2_name }}</th>
-                        <th>Extension</th>
-                    </tr>
-                    {% for file1, file2 in diff_files %}
-                    <tr class="jump-row" data-file="{{ file1 }}">
-                        <td><a href="#{{ file1 | replace('/', '-') }}">{{ file1 }}</a></td>
-                        <td>{{ file2 }}</td>
-                        <td>{{ file1.split('.')[-1] }}</td>
-                    </tr>
-                    {% endfor %}
-                </table>
-            </div>
-        </div>
-        
-        <div class="same-files section">
-            <h2 class="section-header" onclick="toggleSection('same-files-content')">Files with Same Content: ({{ same_files|length }})</h2>
-            <div id="same-files-content" class="section-content">
-                <table>
-                    <tr>
-                        <th>File in {{ repo1_name }}</th>
-                        <th>File in {{ repo2_name }}</th>
-                    </tr>
-                    {% for file1, file2 in same_files %}
-                    <tr>
-                        <td>{{ file1 }}</td>
-                        <td>{{ file2 }}</td>
-                    </tr>
-                    {% endfor %}
-                </table>
-            </div>
-        </div>
-        
-        <div class="file-list section">
-            <h2 class="section-header" onclick="toggleSection('only-in-repo1-content')">Files only in {{ repo1_name }}: ({{ only_in_repo1|length }})</h2>
-            <div id="only-in-repo1-content" class="section-content">
-                <ul>
-                {% for file in only_in_repo1 %}
-                    <li>{{ file }}</li>
-                {% endfor %}
-                </ul>
-            </div>
-        </div>
-        
-        <div class="file-list section">
-            <h2 class="section-header" onclick="toggleSection('only-in-repo2-content')">Files only in {{ repo2_name }}: ({{ only_in_repo2|length }})</h2>
-            <div id="only-in-repo2-content" class="section-content">
-                <ul>
-                {% for file in only_in_repo2 %}
-                    <li>{{ file }}</li>
-                {% endfor %}
-                </ul>
-            </div>
-        </div>
-        
-        <div class="diff-section section">
-            <h2 class="section-header" onclick="toggleSection('diff-section-content')">File Differences: ({{ diff_files|length }})</h2>
-            <div id="diff-section-content" class="section-content">
-                {% for file1, file2 in diff_files %}
-                <div id="{{ file1 | replace('/', '-') }}" class="diff-file" data-file="{{ file1 }}">
-                    <h3>{{ file1 }} vs {{ file2 }}</h3>
-                    {{ side_by_side_diff(repo1_path + '/' + file1, repo2_path + '/' + file2, repo1_name + '/' + file1, repo2_name + '/' + file2) }}
-                </div>
-                {% endfor %}
-            </div>
-        </div>
-
-        <script>
-            function toggleSection(sectionId) {
-                var content = document.getElementById(sectionId);
-                var header = content.previousElementSibling;
-                if (content.style.display === 'none' || content.style.display === '') {
-                    content.style.display = 'block';
-                    header.innerHTML = header.innerHTML.replace('▼', '▲');
-                } else {
-                    content.style.display = 'none';
-                    header.innerHTML = header.innerHTML.replace('▲', '▼');
-                }
+JSDIFF_URL = "https://cdn.jsdelivr.net/npm/diff@5.2.0/dist/diff.min.js"
+# Subresource integrity hash of that exact file, so the browser refuses anything else served at the URL
+JSDIFF_INTEGRITY = "sha384-lJJVaUgxmk/PVfQnAsGN1QuJZrE+n6bg2EMu33yVZOJ2av/3UzTHbmnPCI7ENJYa"
+
+# The report is written straight to the output file: static stylesheet and script blocks,
+# with the per-file sections formatted in between (file names are HTML-escaped)
+REPORT_STYLE = """    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; padding: 20px; }
+        h1, h2 { color: #333; }
+        .file-list { margin-bottom: 20px; }
+        .file-list ul { list-style-type: none; padding-left: 20px; }
+        .diff-section { margin-bottom: 40px; }
+        .diff-file { margin-bottom: 20px; border: 1px solid #ddd; padding: 10px; }
+        .diff-file h3 { margin-top: 0; }
+        table.diff { font-family: monospace; border-collapse: collapse; width: 100%; }
+        .diff_header { background-color: #e0e0e0; }
+        td.diff_header { text-align: right; }
+        td.diff_text { white-space: pre; }
+        .diff_next { background-color: #c0c0c0; }
+        .diff_add { background-color: #aaffaa; }
+        .diff_chg { background-color: #ffff77; }
+        .diff_sub { background-color: #ffaaaa; }
+        #jump-table { margin-bottom: 20px; }
+        #jump-table table { border-collapse: collapse; width: 100%; }
+        #jump-table th, #jump-table td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        #jump-table th { background-color: #f2f2f2; }
+        #filter-section { margin-bottom: 20px; }
+        .hidden { display: none; }
+        .filter-options { margin-top: 10px; }
+        .filter-options span { margin-right: 10px; cursor: pointer; }
+        .filter-options span:hover { text-decoration: underline; }
+        .same-files { margin-bottom: 20px; }
+        .same-files table { border-collapse: collapse; width: 100%; }
+        .same-files th, .same-files td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        .same-files th { background-color: #f2f2f2; }
+        #search-bar { margin-bottom: 20px; }
+        #search-input { width: 300px; padding: 5px; }
+        .section-header { cursor: pointer; background-color: #f0f0f0; padding: 10px; border: 1px solid #ddd; border-radius: 5px; margin-bottom: 10px; }
+        .section-header:hover { background-color: #e0e0e0; }
+        .section-content { display: none; }
+        pre.client-diff-patch { font-family: monospace; margin: 0; }
+    </style>
+"""
+
+REPORT_SCRIPT = """    <script>
+        function toggleSection(sectionId) {
+            var content = document.getElementById(sectionId);
+            var header = content.previousElementSibling;
+            if (content.style.display === 'none' || content.style.display === '') {
+                content.style.display = 'block';
+                header.innerHTML = header.innerHTML.replace('▼', '▲');
+            } else {
+                content.style.display = 'none';
+                header.innerHTML = header.innerHTML.replace('▲', '▼');
             }
+        }
 
-            function filterFiles() {
-                const filterValue = document.getElementById('file-filter').value.toLowerCase();
-                const diffFiles = document.querySelectorAll('.diff-file');
-                const jumpRows = document.querySelectorAll('.jump-row');
-                let hasVisibleContent = false;
-
-                diffFiles.forEach(file => {
-                    const fileName = file.getAttribute('data-file').toLowerCase();
-                    if (fileName.includes(filterValue)) {
-                        file.classList.remove('hidden');
-                        hasVisibleContent = true;
-                    } else {
-                        file.classList.add('hidden');
-                    }
-                });
+        // Lowercased names and texts are collected once, on first use, instead of on every filter/search
+        var filterIndex = null;
+        var searchIndex = null;
 
-                jumpRows.forEach(row => {
-                    const fileName = row.getAttribute('data-file').toLowerCase();
-                    if (fileName.includes(filterValue)) {
-                        row.classList.remove('hidden');
-                        hasVisibleContent = true;
-                    } else {
-                        row.classList.add('hidden');
-                    }
+        function getFilterIndex() {
+            if (filterIndex === null) {
+                filterIndex = [];
+                document.querySelectorAll('.diff-file, .jump-row').forEach(function(el) {
+                    filterIndex.push({ el: el, name: el.getAttribute('data-file').toLowerCase() });
                 });
+            }
+            return filterIndex;
+        }
 
-                // Unfold sections if there's visible content
-                if (hasVisibleContent) {
-                    document.querySelectorAll('.section-content').forEach(section => {
-                        section.style.display = 'block';
-                        const header = section.previousElementSibling;
-                        header.innerHTML = header.innerHTML.replace('▼', '▲');
-                    });
+        function getSearchIndex() {
+            if (searchIndex === null) {
+                searchIndex = [];
+                var sections = document.getElementsByClassName('section-content');
+                for (var i = 0; i < sections.length; i++) {
+                    var entries = [];
+                    var elements = sections[i].querySelectorAll('tr, li');
+                    for (var j = 0; j < elements.length; j++) {
+                        entries.push({ el: elements[j], text: elements[j].textContent.toLowerCase() });
+                    }
+                    searchIndex.push({ section: sections[i], entries: entries });
                 }
             }
+            return searchIndex;
+        }
 
-            function resetFilter() {
-                document.getElementById('file-filter').value = '';
-                const diffFiles = document.querySelectorAll('.diff-file');
-                const jumpRows = document.querySelectorAll('.jump-row');
+        function filterFiles() {
+            const filterValue = document.getElementById('file-filter').value.toLowerCase();
+            let hasVisibleContent = false;
 
-                diffFiles.forEach(file => file.classList.remove('hidden'));
-                jumpRows.forEach(row => row.classList.remove('hidden'));
+            getFilterIndex().forEach(entry => {
+                if (entry.name.includes(filterValue)) {
+                    entry.el.classList.remove('hidden');
+                    hasVisibleContent = true;
+                } else {
+                    entry.el.classList.add('hidden');
+                }
+            });
 
-                // Fold all sections
+            // Unfold sections if there's visible content
+            if (hasVisibleContent) {
                 document.querySelectorAll('.section-content').forEach(section => {
-                    section.style.display = 'none';
+                    section.style.display = 'block';
                     const header = section.previousElementSibling;
-                    header.innerHTML = header.innerHTML.replace('▲', '▼');
+                    header.innerHTML = header.innerHTML.replace('▼', '▲');
                 });
             }
+        }
 
-            function setFilter(value) {
-                document.getElementById('file-filter').value = value;
-                filterFiles();
-            }
-            
-            function searchFiles() {
-                var searchValue = document.getElementById('search-input').value.toLowerCase();
-                var sections = document.getElementsByClassName('section-content');
+        function resetFilter() {
+            document.getElementById('file-filter').value = '';
+            getFilterIndex().forEach(entry => entry.el.classList.remove('hidden'));
 
-                for (var i = 0; i < sections.length; i++) {
-                    var section = sections[i];
-                    var rows = section.getElementsByTagName('tr');
-                    var items = section.getElementsByTagName('li');
-                    var visibleCount = 0;
-
-                    // Search in table rows
-                    for (var j = 0; j < rows.length; j++) {
-                        var row = rows[j];
-                        if (row.textContent.toLowerCase().includes(searchValue)) {
-                            row.style.display = '';
-                            visibleCount++;
-                        } else {
-                            row.style.display = 'none';
-                        }
-                    }
+            // Fold all sections
+            document.querySelectorAll('.section-content').forEach(section => {
+                section.style.display = 'none';
+                const header = section.previousElementSibling;
+                header.innerHTML = header.innerHTML.replace('▲', '▼');
+            });
+        }
 
-                    // Search in list items
-                    for (var k = 0; k < items.length; k++) {
-                        var item = items[k];
-                        if (item.textContent.toLowerCase().includes(searchValue)) {
-                            item.style.display = '';
-                            visibleCount++;
-                        } else {
-                            item.style.display = 'none';
-                        }
-                    }
+        function setFilter(value) {
+            document.getElementById('file-filter').value = value;
+            filterFiles();
+        }
+        
+        function searchFiles() {
+            var searchValue = document.getElementById('search-input').value.toLowerCase();
+            var index = getSearchIndex();
+
+            for (var i = 0; i < index.length; i++) {
+                var section = index[i].section;
+                var entries = index[i].entries;
+                var visibleCount = 0;
 
-                    // Show/hide section based on search results
-                    section.style.display = visibleCount > 0 ? 'block' : 'none';
-                    var header = section.previousElementSibling;
-                    header.innerHTML = header.innerHTML.replace(visibleCount > 0 ? '▼' : '▲', visibleCount > 0 ? '▲' : '▼');
+                // Search in table rows and list items
+                for (var j = 0; j < entries.length; j++) {
+                    if (entries[j].text.includes(searchValue)) {
+                        entries[j].el.style.display = '';
+                        visibleCount++;
+                    } else {
+                        entries[j].el.style.display = 'none';
+                    }
                 }
 
-                // Always show headers
-                var headers = document.getElementsByClassName('section-header');
-                for (var l = 0; l < headers.length; l++) {
-                    headers[l].style.display = 'block';
+                // Show/hide section based on search results
+                section.style.display = visibleCount > 0 ? 'block' : 'none';
+                var header = section.previousElementSibling;
+                header.innerHTML = header.innerHTML.replace(visibleCount > 0 ? '▼' : '▲', visibleCount > 0 ? '▲' : '▼');
+            }
+
+            // Always show headers
+            var headers = document.getElementsByClassName('section-header');
+            for (var l = 0; l < headers.length; l++) {
+                headers[l].style.display = 'block';
+            }
+        }
+
+        function resetSearch() {
+            document.getElementById('search-input').value = '';
+            var index = searchIndex || [];
+
+            for (var i = 0; i < index.length; i++) {
+                // Reset table rows and list items
+                for (var j = 0; j < index[i].entries.length; j++) {
+                    index[i].entries[j].el.style.display = '';
                 }
             }
 
-            function resetSearch() {
-                document.getElementById('search-input').value = '';
-                var sections = document.getElementsByClassName('section-content');
+            // Hide sections
+            var sections = document.getElementsByClassName('section-content');
+            for (var k = 0; k < sections.length; k++) {
+                sections[k].style.display = 'none';
+                var header = sections[k].previousElementSibling;
+                header.innerHTML = header.innerHTML.replace('▲', '▼');
+            }
+        }
 
-                for (var i = 0; i < sections.length; i++) {
-                    var section = sections[i];
-                    var rows = section.getElementsByTagName('tr');
-                    var items = section.getElementsByTagName('li');
+        // Filter and search as the user types, once typing pauses
+        function debounce(fn, delay) {
+            var timer = null;
+            return function() {
+                clearTimeout(timer);
+                timer = setTimeout(fn, delay);
+            };
+        }
 
-                    // Reset table rows
-                    for (var j = 0; j < rows.length; j++) {
-                        rows[j].style.display = '';
-                    }
+        document.addEventListener('DOMContentLoaded', function() {
+            var filterInput = document.getElementById('file-filter');
+            var searchInput = document.getElementById('search-input');
+            filterInput.addEventListener('input', debounce(function() {
+                filterInput.value ? filterFiles() : resetFilter();
+            }, 50));
+            searchInput.addEventListener('input', debounce(function() {
+                searchInput.value ? searchFiles() : resetSearch();
+            }, 50));
+        });
 
-                    // Reset list items
-                    for (var k = 0; k < items.length; k++) {
-                        items[k].style.display = '';
+        function renderClientDiff(container) {
+            var payload = JSON.parse(container.querySelector('script').textContent);
+            var patch = Diff.createTwoFilesPatch(payload.name1, payload.name2, payload.a, payload.b, '', '', { context: 3 });
+            var pre = document.createElement('pre');
+            pre.className = 'client-diff-patch';
+            patch.split('\\n').forEach(function(line) {
+                var row = document.createElement('div');
+                if (line.startsWith('+++') || line.startsWith('---') || line.startsWith('@@')) {
+                    row.className = 'diff_header';
+                } else if (line.startsWith('+')) {
+                    row.className = 'diff_add';
+                } else if (line.startsWith('-')) {
+                    row.className = 'diff_sub';
+                }
+                row.textContent = line;
+                pre.appendChild(row);
+            });
+            container.appendChild(pre);
+        }
+
+        // Render client-side diffs lazily, once each file becomes visible
+        document.addEventListener('DOMContentLoaded', function() {
+            var containers = document.querySelectorAll('.client-diff');
+            if (!containers.length) {
+                return;
+            }
+            // jsdiff comes from a CDN; if it is unreachable or fails its integrity check, say so in place of each diff
+            if (!window.Diff) {
+                containers.forEach(function(container) {
+                    var message = document.createElement('p');
+                    message.textContent = 'Diff renderer failed to load; this diff cannot be shown.';
+                    container.appendChild(message);
+                });
+                return;
+            }
+            if (!('IntersectionObserver' in window)) {
+                containers.forEach(renderClientDiff);
+                return;
+            }
+            var observer = new IntersectionObserver(function(entries) {
+                entries.forEach(function(entry) {
+                    if (entry.isIntersecting) {
+                        observer.unobserve(entry.target);
+                        renderClientDiff(entry.target);
                     }
+                });
+            });
+            containers.forEach(function(container) { observer.observe(container); });
+        });
 
-                    // Hide sections
-                    section.style.display = 'none';
-                    var header = section.previousElementSibling;
-                    header.innerHTML = header.innerHTML.replace('▲', '▼');
-                }
+        // Initialize all sections as closed
+        document.addEventListener('DOMContentLoaded', function() {
+            var sections = document.getElementsByClassName('section');
+            for (var i = 0; i < sections.length; i++) {
+                var header = sections[i].getElementsByClassName('section-header')[0];
+                var content = sections[i].getElementsByClassName('section-content')[0];
+                content.style.display = 'none';
+                header.innerHTML += ' ▼';
             }
+        });
+    </script>
+</body>
+</html>
+"""
 
-            // Initialize all sections as closed
-            document.addEventListener('DOMContentLoaded', function() {
-                var sections = document.getElementsByClassName('section');
-                for (var i = 0; i < sections.length; i++) {
-                    var header = sections[i].getElementsByClassName('section-header')[0];
-                    var content = sections[i].getElementsByClassName('section-content')[0];
-                    content.style.display = 'none';
-                    header.innerHTML += ' ▼';
-                }
-            });
-        </script>
-    </body>
-    </html>
+def get_filter_options(files):
+    """Get the unique file extensions and directories of the files in one pass, both sorted."""
+    extensions, directories = set(), set()
+    sep = os.sep
+    for file in files:
+        path = file[0]
+        dot, slash = path.rfind('.'), path.rfind(sep)
+        # Like os.path.splitext, a name's leading dots do not start an extension
+        if dot > slash and path[slash + 1:dot].lstrip('.'):
+            extensions.add(path[dot:])
+        if slash > 0:
+            directories.add(path[:slash])
+    return sorted(extensions), sorted(directories)
+
+def only_in_label(files):
+    """Name what an only-in list holds: plain files, or also directories collapsed to 'dir/' entries."""
+    return 'files/directories' if any(file.endswith(os.sep) for file in files) else 'files'
+
+def render_diff_block(file1, file2, diff_html):
+    """Wrap one file's rendered diff in its report block."""
+    return (
+        f'\n            <div id="{html.escape(file1.replace("/", "-"))}" class="diff-file" data-file="{html.escape(file1)}">\n'
+        f'                <h3>{html.escape(file1)} vs {html.escape(file2)}</h3>\n'
+        f'                {diff_html}\n'
+        f'            </div>'
+    )
+
+def _section(section_class, content_id, title, body, section_id=None):
+    """Format one collapsible report section around an already-rendered body."""
+    id_attr = f' id="{section_id}"' if section_id else ''
+    return (
+        f'    <div{id_attr} class="{section_class}">\n'
+        f'        <h2 class="section-header" onclick="toggleSection(\'{content_id}\')">{title}</h2>\n'
+        f'        <div id="{content_id}" class="section-content">\n'
+        f'{body}'
+        f'        </div>\n'
+        f'    </div>\n'
+    )
+
+def generate_html_report(repo1_name, repo2_name, diff_files, same_files, only_in_repo1, only_in_repo2, file_diffs, report_file, client_diff=False):
+    """Write a single HTML report containing all diffs, similarities, and file lists to report_file.
+
+    file_diffs yields (file1, file2, diff_html) for each entry of diff_files. The report is
+    streamed, so only the few diffs rendered ahead of the writer are held in memory at a time.
+    With client_diff, the diffs are JSON payloads that the page renders with jsdiff when each
+    file scrolls into view.
     """
-    
-    template = Template(html_template)
-    html_content = template.render(
-        repo1_name=repo1_name,
-        repo2_name=repo2_name,
-        diff_files=diff_files,
-        same_files=same_files,
-        only_in_repo1=only_in_repo1,
-        only_in_repo2=only_in_repo2,
-        repo1_path=repo1_path,
-        repo2_path=repo2_path,
-        side_by_side_diff=side_by_side_diff,
-        extensions=extensions,
-        directories=directories
+    escape = html.escape
+    extensions, directories = get_filter_options(itertools.chain(diff_files, same_files))
+    repo1_name, repo2_name = escape(repo1_name), escape(repo2_name)
+    write = report_file.write
+
+    write(
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n'
+        '    <meta charset="UTF-8">\n'
+        '    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+        f'    <title>Repository Comparison: {repo1_name} vs {repo2_name}</title>\n'
+    )
+    write(REPORT_STYLE)
+    if client_diff:
+        write(f'    <script src="{JSDIFF_URL}" integrity="{JSDIFF_INTEGRITY}" crossorigin="anonymous"></script>\n')
+    write(
+        '</head>\n<body>\n'
+        f'    <h1>Repository Comparison: {repo1_name} vs {repo2_name}</h1>\n\n'
+        '    <div id="filter-section">\n'
+        '        <label for="file-filter">Filter files: </label>\n'
+        '        <input type="text" id="file-filter" placeholder="e.g., .sol, contracts/">\n'
+        '        <button onclick="filterFiles()">Filter</button>\n'
+        '        <button onclick="resetFilter()">Reset</button>\n'
+        '        <div class="filter-options">\n'
+        '            <strong>Extensions:</strong>\n'
+        + ''.join(f'            <span onclick="setFilter(\'{escape(ext)}\')">{escape(ext)}</span>\n' for ext in extensions)
+        + '        </div>\n'
+        '        <div class="filter-options">\n'
+        '            <strong>Directories:</strong>\n'
+        + ''.join(f'            <span onclick="setFilter(\'{escape(directory)}/\')">{escape(directory)}/</span>\n' for directory in directories)
+        + '        </div>\n'
+        '    </div>\n\n'
+        '    <div id="search-bar">\n'
+        '        <label for="search-input">Search files: </label>\n'
+        '        <input type="text" id="search-input" placeholder="e.g., Contract.sol, contracts/">\n'
+        '        <button onclick="searchFiles()">Search</button>\n'
+        '        <button onclick="resetSearch()">Reset</button>\n'
+        '    </div>\n\n'
+    )
+
+    write(_section(
+        'section', 'jump-table-content', f'Jump to File Differences: ({len(diff_files)})',
+        '            <table>\n'
+        f'                <tr><th>File in {repo1_name}</th><th>File in {repo2_name}</th><th>Extension</th></tr>\n'
+        + ''.join(
+            f'                <tr class="jump-row" data-file="{escape(file1)}"><td><a href="#{escape(file1.replace("/", "-"))}">'
+            f'{escape(file1)}</a></td><td>{escape(file2)}</td><td>{escape(file1.split(".")[-1])}</td></tr>\n'
+            for file1, file2 in diff_files
+        )
+        + '            </table>\n',
+        section_id='jump-table'
+    ))
+    write(_section(
+        'same-files section', 'same-files-content', f'Files with Same Content: ({len(same_files)})',
+        '            <table>\n'
+        f'                <tr><th>File in {repo1_name}</th><th>File in {repo2_name}</th></tr>\n'
+        + ''.join(f'                <tr><td>{escape(file1)}</td><td>{escape(file2)}</td></tr>\n' for file1, file2 in same_files)
+        + '            </table>\n'
+    ))
+    for content_id, repo_name, files in (('only-in-repo1-content', repo1_name, only_in_repo1),
+                                         ('only-in-repo2-content', repo2_name, only_in_repo2)):
+        write(_section(
+            'file-list section', content_id, f'{only_in_label(files).capitalize()} only in {repo_name}: ({len(files)})',
+            '            <ul>\n'
+            + ''.join(f'                <li>{escape(file)}</li>\n' for file in files)
+            + '            </ul>\n'
+        ))
+
+    # Diff blocks are written one at a time as file_diffs produces them
+    write(
+        '    <div class="diff-section section">\n'
+        f'        <h2 class="section-header" onclick="toggleSection(\'diff-section-content\')">File Differences: ({len(diff_files)})</h2>\n'
+        '        <div id="diff-section-content" class="section-content">'
     )
-    
-    return html_content
+    for file1, file2, diff_html in file_diffs:
+        write(render_diff_block(file1, file2, diff_html))
+    write('\n        </div>\n    </div>\n\n')
+    write(REPORT_SCRIPT)